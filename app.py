@@ -9,6 +9,24 @@ import altair as alt
 import experiments as ex
 import util
 
+
+@st.cache(show_spinner=False)
+def warm_up_kernels():
+    return ex.warm_up()
+
+
+@st.cache(show_spinner=False)
+def run_ts_time_series(model_accuracies, time_series_length, no_of_rewards):
+    return ex.generate_ts_time_series(list(model_accuracies), time_series_length, no_of_rewards)
+
+
+@st.cache(show_spinner=False)
+def run_control_time_series(model_accuracies, time_series_length, no_of_rewards):
+    return ex.generate_control_time_series(list(model_accuracies), time_series_length, no_of_rewards)
+
+
+warm_up_kernels()
+
 col1, col2 = st.columns(2)
 
 with col1:
@@ -57,48 +75,64 @@ with col2:
 
     ROUTING_ALGO = st.selectbox("Routing Algorithm:", options=["Thompson Sampling"])
 
+REQUEST_SCALE = (NO_OF_REQUESTS // NO_OF_MODELS) // NO_OF_REWARDS
+ONE_MINUS_ACCURACIES = 1.0 - np.asarray(MODEL_ACCURACIES)
+
 # Generating Thompson Sampling experiment data
-ts_bandit_selected = ex.generate_ts_time_series(MODEL_ACCURACIES, TIME_SERIES_LENGTH, NO_OF_REWARDS)
-ts_bandit_selected = util.format_as_dataframe(ts_bandit_selected)
-ts_misclassifications = util.create_misclassification_df(ts_bandit_selected, MODEL_ACCURACIES) * ((NO_OF_REQUESTS // NO_OF_MODELS) // NO_OF_REWARDS)
+ts_bandit_selected = run_ts_time_series(tuple(MODEL_ACCURACIES), TIME_SERIES_LENGTH, NO_OF_REWARDS)
+ts_mis_arr = util.create_misclassification_arr(ts_bandit_selected, ONE_MINUS_ACCURACIES, scale=REQUEST_SCALE)
 
 # Generating control experiment data
-control_bandit_selected = ex.generate_control_time_series(MODEL_ACCURACIES, TIME_SERIES_LENGTH, NO_OF_REWARDS)
-control_bandit_selected = util.format_as_dataframe(control_bandit_selected)
-control_misclassifications = util.create_misclassification_df(control_bandit_selected, MODEL_ACCURACIES) * ((NO_OF_REQUESTS // NO_OF_MODELS) // NO_OF_REWARDS)
+control_bandit_selected = run_control_time_series(tuple(MODEL_ACCURACIES), TIME_SERIES_LENGTH, NO_OF_REWARDS)
+control_mis_arr = util.create_misclassification_arr(control_bandit_selected, ONE_MINUS_ACCURACIES, scale=REQUEST_SCALE)
 
 # Translating misclassifications to the financial cost between control and bandit
-total_ts_misclassifications = sum(ts_misclassifications.iloc[-1, :])
-total_control_misclassifications = sum(control_misclassifications.iloc[-1, :])
+total_ts_misclassifications = int(ts_mis_arr.sum())
+total_control_misclassifications = int(control_mis_arr.sum())
 misclassification_diff = total_control_misclassifications - total_ts_misclassifications
 cost_incurred = misclassification_diff * COST_OF_FAILURE
 
 
 # Cumulative cost of misclassification plot
-ts_cumsum = ts_misclassifications.sum(axis=1).iloc[:-1].cumsum() * COST_OF_FAILURE
-control_cumsum = control_misclassifications.sum(axis=1).iloc[:-1].cumsum() * COST_OF_FAILURE
-
-ts_cumsum = pd.concat([ts_cumsum, pd.Series(["Thompson Sampling" for i in range(len(ts_cumsum))])], axis=1).reset_index()
-control_cumsum = pd.concat([control_cumsum, pd.Series(["Control" for i in range(len(control_cumsum))])], axis=1).reset_index()
-total_cumsum = pd.concat([ts_cumsum, control_cumsum])
-total_cumsum.columns = [f"Time step ({TIME_UNIT})", "Cost of failure", "Algorithm"]
+ts_cost = ts_mis_arr.sum(axis=1).cumsum() * COST_OF_FAILURE
+control_cost = control_mis_arr.sum(axis=1).cumsum() * COST_OF_FAILURE
+
+# Wide form halves the rows serialized to the browser versus long form, and
+# long series are resampled so the chart payload stays bounded.
+MAX_CHART_POINTS = 1000
+time_steps = np.arange(TIME_SERIES_LENGTH)
+if TIME_SERIES_LENGTH > MAX_CHART_POINTS:
+    chart_steps = np.linspace(0, TIME_SERIES_LENGTH - 1, MAX_CHART_POINTS)
+    ts_cost_plot = np.interp(chart_steps, time_steps, ts_cost)
+    control_cost_plot = np.interp(chart_steps, time_steps, control_cost)
+else:
+    chart_steps, ts_cost_plot, control_cost_plot = time_steps, ts_cost, control_cost
+
+chart_data = pd.DataFrame({
+    f"Time step ({TIME_UNIT})": chart_steps,
+    "Thompson Sampling": ts_cost_plot,
+    "Control": control_cost_plot,
+})
 
 with col1:
     st.title(f"Cumulative Financial Impact: ${cost_incurred}")
 
-    fig = alt.Chart(total_cumsum).mark_line().encode(
+    fig = alt.Chart(chart_data).transform_fold(
+        ["Thompson Sampling", "Control"],
+        as_=["Algorithm", "Cost of failure"]
+    ).mark_line().encode(
         x=f"Time step ({TIME_UNIT})",
-        y='Cost of failure',
-        color='Algorithm',
-        strokeDash='Algorithm'
+        y='Cost of failure:Q',
+        color='Algorithm:N',
+        strokeDash='Algorithm:N'
     ).interactive()
 
     st.altair_chart(fig, use_container_width=True)
 
     # Tabular information that we care about
-    model_misclassifications = pd.concat([control_misclassifications.sum(), ts_misclassifications.sum()], axis=1)
+    model_misclassifications = pd.DataFrame({"Control": control_mis_arr.sum(axis=0),
+                                             "Thompson Sampling": ts_mis_arr.sum(axis=0)})
     model_misclassifications.index = model_misclassifications.index + 1
-    model_misclassifications.columns = ["Control", "Thompson Sampling"]
     st.markdown("The table below displays the number of misclassifications made by each model in the control and MAB experiment respectively.")
     st.write(model_misclassifications)
 
@@ -1,140 +1,186 @@
-import random
-import pandas as pd
 import numpy as np
-from collections import Counter
+from numba import njit, prange, vectorize
 
 
-def create_simulated_reward_data(model_accuracies, no_of_rewards):
+def warm_up():
     """
-    Generates a DataFrame of synthetic reward data. Columns are each of the models in the MAB setup. 
-    Rows are the reward passed to each model for a given observation. 
-    
+    Triggers JIT compilation of the numba kernels on a tiny two-model,
+    one-step problem so the first real experiment does not pay the
+    compilation cost. Safe to call more than once.
+    """
+    accuracies = np.full(2, 0.5, dtype=np.float64)
+    reward_tensor = _simulate_reward_tensor(accuracies, 1, 2)
+    _ts_series_kernel(reward_tensor, np.zeros(2, dtype=np.int64), np.zeros(2, dtype=np.int64))
+    return True
+
+
+def create_simulated_reward_data(model_accuracies, no_of_rewards, rng=None):
+    """
+    Generates an array of synthetic reward data. Columns are each of the models in the MAB setup.
+    Rows are the reward passed to each model for a given observation.
+
     Parameters:
         model_accuracies (list): List of each of the model accuracies being compared.
         no_of_rewards (int): Number of rewards observed within the given time window.
-    
-    Returns: 
-        
+        rng (np.random.Generator): Optional generator to reuse across windows;
+                                   a fresh one is created when omitted.
+
+    Returns:
+        data (np.ndarray): (no_of_rewards, no_of_models) int8 matrix of rewards.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    accuracies_arr = np.asarray(model_accuracies, dtype=np.float64)
+
+    data = rng.binomial(1, accuracies_arr, size=(no_of_rewards, accuracies_arr.shape[0]))
+    return data.astype(np.int8, copy=False)
+
+@njit(cache=True)
+def _seed_kernels(seed):
+    # Seeds numba's RNG state, which is separate from numpy's global state.
+    np.random.seed(seed)
+
+
+@njit(cache=True, parallel=True)
+def _simulate_reward_tensor(model_accuracies, time_series_length, no_of_rewards):
     """
-    rng = np.random.default_rng()
-    data = {}
-    
-    for i in range(len(model_accuracies)):
-        data[f"Model {i}"] = rng.binomial(1, model_accuracies[i], no_of_rewards)
+    Generates the reward data for every time step up front as a
+    (time_series_length, no_of_rewards, no_of_models) int8 tensor. The time
+    steps are independent, so they are filled in parallel with prange.
+    """
+    no_of_models = model_accuracies.shape[0]
+    tensor = np.empty((time_series_length, no_of_rewards, no_of_models), dtype=np.int8)
+
+    for t in prange(time_series_length):
+        for n in range(no_of_rewards):
+            for i in range(no_of_models):
+                tensor[t, n, i] = np.random.binomial(1, model_accuracies[i])
+
+    return tensor
+
+
+@njit(cache=True)
+def _ts_series_kernel(reward_tensor, rewards, penalties):
+    """
+    Runs the Thompson Sampling selection loop over every time step of a
+    (time_series_length, no_of_rewards, no_of_models) reward tensor in a
+    single compiled call, carrying the reward/penalty state across steps.
+    """
+    time_series_length = reward_tensor.shape[0]
+    no_of_models = reward_tensor.shape[2]
+    results = np.empty((time_series_length, no_of_models), dtype=np.int64)
+
+    for t in range(time_series_length):
+        results[t] = _ts_kernel(reward_tensor[t], rewards, penalties)
+
+    return results
+
+
+def generate_ts_time_series(model_accuracies, time_series_length, no_of_rewards, seed=None):
+    if seed is not None:
+        _seed_kernels(seed)
 
-    data = pd.DataFrame(data)
-    return data
+    no_of_models = len(model_accuracies)
+    rewards = np.zeros(no_of_models, dtype=np.int64)
+    penalties = np.zeros(no_of_models, dtype=np.int64)
+
+    accuracies_arr = np.asarray(model_accuracies, dtype=np.float64)
+    reward_tensor = _simulate_reward_tensor(accuracies_arr, time_series_length, no_of_rewards)
+
+    return _ts_series_kernel(reward_tensor, rewards, penalties)
 
             
-def generate_ts_time_series(model_accuracies, time_series_length, no_of_rewards):
-    reward_dict = {"rewards": None, "penalties": None}
-    results_list = []
+@vectorize(["float64(int64, int64)"], nopython=True, cache=True)
+def _beta_sample(rewards, penalties):
+    # Beta(a, b) as a ratio of two Gamma draws: x / (x + y) with
+    # x ~ Gamma(a), y ~ Gamma(b), where a = rewards + 1 and b = penalties + 1.
+    x = np.random.standard_gamma(rewards + 1.0)
+    y = np.random.standard_gamma(penalties + 1.0)
+    return x / (x + y)
+
 
-    init_rewards = [0] * len(model_accuracies)
-    init_penalties = [0] * len(model_accuracies)
+@njit(cache=True)
+def _ts_kernel(data_arr, rewards, penalties):
+    """
+    Compiled Thompson Sampling selection loop. Draws a Beta sample per model
+    for every observation, routes the observation to the winning model and
+    updates the reward/penalty accumulators in place.
 
-    for i in range(time_series_length):
+    Parameters:
+        data_arr (np.ndarray): (no_of_observations, no_of_models) reward matrix.
+        rewards (np.ndarray): int64 per-model reward accumulators.
+        penalties (np.ndarray): int64 per-model penalty accumulators.
 
-        if i == 0:
-            data = create_simulated_reward_data(model_accuracies, no_of_rewards)
-            results, rewards, penalties = thompson_sampling_experiment(data, model_accuracies, init_rewards, init_penalties)
+    Returns:
+        counts (np.ndarray): int64 array of how often each model was selected.
+    """
+    no_of_observations, no_of_models = data_arr.shape
+    counts = np.zeros(no_of_models, dtype=np.int64)
 
-            results_list.append(results)
-            reward_dict["rewards"] = rewards
-            reward_dict["penalties"] = penalties
+    for n in range(no_of_observations):
+        samples = _beta_sample(rewards, penalties)
+        bandit = np.argmax(samples)
 
+        counts[bandit] += 1
+
+        if data_arr[n, bandit] == 1:
+            rewards[bandit] += 1
         else:
-            prev_rewards = reward_dict["rewards"]
-            prev_penalties = reward_dict["penalties"]
+            penalties[bandit] += 1
+
+    return counts
 
-            data = create_simulated_reward_data(model_accuracies, no_of_rewards)
-            results, rewards, penalties = thompson_sampling_experiment(data, model_accuracies, prev_rewards, prev_penalties)
-            
-            results_list.append(results)
-            reward_dict["rewards"] = rewards
-            reward_dict["penalties"] = penalties
-    
-    return results_list
 
-            
 def thompson_sampling_experiment(data, model_accuracies, rewards, penalties):
     """
     Returns the number of incorrect classifications made if observations
     were routed using the Thompson Sampling algorithm.
-    
+
     Parameters:
-        data (pd.DataFrame): DataFrame where columns are the models, and each row was 
-                             the reward passed to the model for a given observation.
+        data (np.ndarray): (no_of_rewards, no_of_models) matrix where each row is
+                           the reward passed to each model for a given observation.
         model_accuracies (list): List of each of the model accuracies being compared.
-                             
-    
-    Returns: 
-        count_of_model_selected (dict): Dictionary where the keys are the model number and the values
-        are the number of times that model was selected for prediction. 
+
+
+    Returns:
+        counts (np.ndarray): int64 array of how often each model was selected
+        for prediction.
     """
-    
-    no_of_observations = int(len(data))
-    no_of_models = int(len(data.columns))
-    
+
+    if hasattr(data, "values"):
+        data = data.values
+    data = np.ascontiguousarray(data, dtype=np.int8)
+    no_of_models = int(data.shape[1])
+
     assert no_of_models == int(len(model_accuracies)), \
             f"The number of models ({no_of_models}) does not match the number of accuracy values ({int(len(model_accuracies))}) provided."
-    model_selected = []
-    
-    for n in range(0, no_of_observations):
-        bandit = 0
-        beta_max = 0
-
-        for i in range(0, no_of_models):
-            beta_d = random.betavariate(rewards[i] + 1, penalties[i] + 1)
-            if beta_d > beta_max:
-                beta_max = beta_d
-                bandit = i
-
-        model_selected.append(bandit)       
-        reward = data.values[n, bandit]
-
-        if reward == 1:
-            rewards[bandit] = rewards[bandit] + 1
-        else:
-            penalties[bandit] = penalties[bandit] + 1
-    
-    count_of_model_selected = dict(Counter(model_selected))
-    return count_of_model_selected, rewards, penalties
+    rewards = np.asarray(rewards, dtype=np.int64)
+    penalties = np.asarray(penalties, dtype=np.int64)
+
+    counts = _ts_kernel(data, rewards, penalties)
+
+    return counts, rewards, penalties
 
 
 def generate_control_time_series(model_accuracies, time_series_length, no_of_rewards):
-    results_list = []
-    
-    for i in range(time_series_length):
-        data = create_simulated_reward_data(model_accuracies, no_of_rewards)
-        results = control_experiment(data, model_accuracies)
-        results_list.append(results)
-        
-    return results_list
-    
-
-def control_experiment(data, model_accuracies):
     """
-    Returns the model selections made if observations
-    were simply split evenly across the models.
-    
+    Returns the model selections made if observations were simply split
+    evenly across the models. The split is identical at every time step, so
+    the whole series is a single tiled row.
+
     Parameters:
         model_accuracies (list): List of each of the model accuracies being compared.
-        no_of_observations (int): Number of observations within time window.
-        
-    Returns: 
-        incorrect_preds (list): Number of incorrect observations from each of the
-                                models being compared. 
+        time_series_length (int): Number of time steps in the series.
+        no_of_rewards (int): Number of rewards observed within each time window.
+
+    Returns:
+        counts (np.ndarray): (time_series_length, no_of_models) int64 matrix of
+                             how often each model was selected per time step.
     """
-    percentage_split = 1 / len(model_accuracies)
-    count_of_model_selected = {}
-    
-    for i in range(len(model_accuracies)): 
-        count_of_model_selected[i] = int(np.floor(len(data) * percentage_split))
-    
-    diff = len(data) - sum(count_of_model_selected.values())
-    if  diff != 0:
-        for i in range(diff):
-            count_of_model_selected[i] += 1
-    
-    return count_of_model_selected
\ No newline at end of file
+    no_of_models = len(model_accuracies)
+    base, remainder = divmod(no_of_rewards, no_of_models)
+
+    counts = np.full(no_of_models, base, dtype=np.int64)
+    counts[:remainder] += 1
+
+    return np.tile(counts, (time_series_length, 1))
\ No newline at end of file
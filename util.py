@@ -1,17 +1,19 @@
+import numpy as np
 import pandas as pd
 
 
-def format_as_dataframe(df):
-    df = pd.DataFrame(df)
-    df.fillna(0, inplace=True)
-    df = df.astype(int)
-    df.loc['Totals'] = df.sum(numeric_only=True, axis=0)
-    return df
+def format_as_dataframe(arr):
+    totals = arr.sum(axis=0)
+    return pd.DataFrame(np.vstack([arr, totals]),
+                        index=list(range(arr.shape[0])) + ['Totals'],
+                        columns=range(arr.shape[1]))
 
 
-def create_misclassification_df(selected_df, model_accuracies):
-    misclassification_dict = {}
-    for i in selected_df.columns:
-        misclassification_dict[i] = (selected_df[i] * (1 - model_accuracies[i])).round().astype(int)
+def create_misclassification_arr(selected_arr, one_minus_accuracies, scale=1):
+    return np.rint(selected_arr * one_minus_accuracies * scale).astype(np.int64)
 
-    return pd.DataFrame(misclassification_dict)
\ No newline at end of file
+
+def create_misclassification_df(selected_df, model_accuracies, scale=1):
+    one_minus_accuracies = 1.0 - np.asarray(model_accuracies)
+    misclassifications = create_misclassification_arr(selected_df.to_numpy(), one_minus_accuracies, scale)
+    return pd.DataFrame(misclassifications, index=selected_df.index, columns=selected_df.columns)
\ No newline at end of file